@@ -10,15 +10,169 @@ Date: 2025-12-01
 """
 
 import csv
+import functools
+import itertools
 import json
 import logging
+import mmap
 import os
+import platform
+import re
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple, Any
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Any
 import shutil
 
+# Number of input rows processed and written per batch in single-process mode
+WRITE_BATCH_SIZE = 1024
+
+# Number of input rows sent to a worker process per task in parallel mode
+PARALLEL_BLOCK_SIZE = 10000
+
+# Number of distinct JSON cells whose processing result is memoised
+JSON_CACHE_SIZE = 4096
+
+# orjson is a CPython extension. On PyPy the JIT-compiled stdlib json module
+# is already fast, so the pure-stdlib path is used there.
+if platform.python_implementation() == 'PyPy':
+    orjson = None
+else:
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+
+
+def _stdlib_dumps(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+# Per-row JSON (de)serialisation uses orjson when it is installed and falls
+# back to the standard library otherwise. Both emit compact UTF-8 JSON, but
+# they format some floats differently (orjson writes 1e29 where the stdlib
+# writes 1e+29).
+if orjson is not None:
+    # orjson rejects NaN/Infinity, which the stdlib accepts and writes back,
+    # and silently reads integers outside the 64-bit range as floats. Any run
+    # of 19+ digits may be such an integer, so those cells skip orjson.
+    _WIDE_NUMBER_RE = re.compile(r'\d{19}')
+
+    def _orjson_dumps(data: Any) -> str:
+        return orjson.dumps(data).decode('utf-8')
+
+    def _json_parse(json_str: str) -> Tuple[Any, Callable[[Any], str]]:
+        if _WIDE_NUMBER_RE.search(json_str) is None:
+            try:
+                return orjson.loads(json_str), _orjson_dumps
+            except orjson.JSONDecodeError:
+                pass
+        # Cells orjson cannot handle are parsed and written by the stdlib,
+        # which also raises json.JSONDecodeError for genuinely malformed JSON
+        return json.loads(json_str), _stdlib_dumps
+else:
+    def _json_parse(json_str: str) -> Tuple[Any, Callable[[Any], str]]:
+        return json.loads(json_str), _stdlib_dumps
+
+
+def _copy_file_contents(src, dst):
+    """
+    Copy the contents of one open binary file to another.
+
+    Uses os.sendfile on Linux so the data is copied inside the kernel, and
+    falls back to a buffered copy with 4 MiB chunks elsewhere or if the
+    filesystem does not support sendfile.
+
+    Args:
+        src: Source file opened for binary reading
+        dst: Destination file opened for binary writing
+    """
+    if sys.platform.startswith('linux') and hasattr(os, 'sendfile'):
+        size = os.fstat(src.fileno()).st_size
+        offset = 0
+        try:
+            while offset < size:
+                sent = os.sendfile(dst.fileno(), src.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+            return
+        except OSError:
+            # Continue from wherever sendfile stopped
+            src.seek(offset)
+            dst.seek(offset)
+
+    shutil.copyfileobj(src, dst, length=1 << 22)
+
+
+def _process_field_value(field_value: Any, search_value: str, replace_value: str) -> Tuple[Any, bool]:
+    """
+    Process field value by replacing search_value with replace_value.
+
+    Args:
+        field_value: The field value to process; non-string values are returned unchanged
+        search_value: The value to search for
+        replace_value: The value to replace search_value with
+
+    Returns:
+        Tuple of (processed_value, was_modified)
+    """
+    if not field_value or not isinstance(field_value, str):
+        return field_value, False
+
+    # Check if search value exists in the field value
+    if search_value and search_value in field_value:
+        new_value = field_value.replace(search_value, replace_value)
+        return new_value, True
+
+    return field_value, False
+
+
+@functools.lru_cache(maxsize=JSON_CACHE_SIZE)
+def _process_json_cached(json_str: str, target_field_name: str, search_value: str,
+                         replace_value: str) -> Tuple[str, bool, bool, Any, Any]:
+    """
+    Find and replace the target field's value in a JSON string.
+
+    The result depends only on the arguments, so it is memoised: cells that
+    repeat across rows are parsed and serialised once. Statistics are left
+    to the caller, which records them from the returned flags.
+
+    Args:
+        json_str: JSON string from the CSV cell
+        target_field_name: The JSON field name to search in
+        search_value: The value to search for
+        replace_value: The value to replace search_value with
+
+    Returns:
+        Tuple of (modified_json_string, was_modified, field_found, original_value, new_value)
+
+    Raises:
+        json.JSONDecodeError: If json_str is not valid JSON
+    """
+    data, json_dumps = _json_parse(json_str)
+
+    # Handle both array and single object; a single object is scanned in
+    # place so it is written back as an object rather than a one-item array
+    items = data if type(data) is list else (data,)
+
+    for item in items:
+        # Parsers only ever produce plain dicts, so an exact type check is enough
+        if type(item) is dict and item.get('name') == target_field_name:
+            original_value = item.get('value', '')
+            new_value, was_modified = _process_field_value(original_value, search_value, replace_value)
+
+            if not was_modified:
+                # Nothing changed, so the original string is returned as-is
+                return json_str, False, True, original_value, new_value
+
+            item['value'] = new_value
+            return json_dumps(data), True, True, original_value, new_value
+
+    return json_str, False, False, None, None
+
 
 class CSVSKUProcessor:
     """Processes CSV files to modify HP SKU values in JSON data."""
@@ -31,17 +185,80 @@ class CSVSKUProcessor:
             config_path: Path to the configuration JSON file
         """
         self.config = self._load_config(config_path)
-        self.stats = {
+        self.stats = self._new_stats()
+
+        # Settings read for every row are looked up once here
+        rules = self.config['processing_rules']
+        self._search_value = rules['search_value']
+        self._replace_value = rules['replace_value']
+        self._target_field_name = rules['target_field_name']
+        self._target_col_index = self.config['general_settings']['target_column_index']
+        # The target name as it appears in unescaped JSON text, e.g. "HP SKU"
+        self._name_needle = json.dumps(self._target_field_name, ensure_ascii=False)
+        # Only the first entries of each detail list are kept; the *_count
+        # stats hold the totals
+        self._max_detail = self.config['logging'].get('max_detail_entries', 1000)
+        self._setup_logging()
+
+    @staticmethod
+    def _new_stats() -> Dict:
+        """
+        Return an empty statistics dictionary.
+
+        Per-row details are stored column-wise as a tuple of parallel lists,
+        which avoids allocating a dict for every recorded row.
+        """
+        return {
             'total_rows': 0,
             'rows_processed': 0,
             'rows_modified': 0,
+            'rows_skipped': 0,
             'errors': 0,
-            'malformed_json': [],
-            'missing_hp_sku': [],
+            'malformed_json': ([], []),  # row, error
+            'malformed_json_count': 0,
+            'missing_hp_sku': ([], []),  # row, reason
+            'missing_hp_sku_count': 0,
             'skus_unchanged': 0,
-            'skus_modified': []
+            'skus_modified': ([], [], []),  # row, original, new
+            'skus_modified_count': 0
         }
-        self._setup_logging()
+
+    def _merge_stats(self, partial_stats: Dict):
+        """Merge statistics collected by a worker process into self.stats."""
+        for key, value in partial_stats.items():
+            if isinstance(value, tuple):
+                for column, partial_column in zip(self.stats[key], value):
+                    column.extend(partial_column)
+                    del column[self._max_detail:]
+            else:
+                self.stats[key] += value
+
+    def _record_detail(self, key: str, *values: Any):
+        """
+        Count an event and keep its details if the detail columns are not yet full.
+
+        Args:
+            key: Stats key of the detail columns; the total is kept under '<key>_count'
+            values: One value per column, in column order
+        """
+        count_key = key + '_count'
+        if self.stats[count_key] < self._max_detail:
+            for column, value in zip(self.stats[key], values):
+                column.append(value)
+        self.stats[count_key] += 1
+
+    def _detail_entries(self, key: str, limit: Optional[int] = None) -> Iterator[Tuple]:
+        """
+        Iterate over the recorded details of an event type as row tuples.
+
+        Args:
+            key: Stats key of the detail columns
+            limit: Maximum number of entries to return
+
+        Returns:
+            Iterator of tuples with one value per column
+        """
+        return itertools.islice(zip(*self.stats[key]), limit)
 
     def _load_config(self, config_path: str) -> Dict:
         """Load configuration from JSON file."""
@@ -57,6 +274,9 @@ class CSVSKUProcessor:
 
     def _setup_logging(self):
         """Setup logging configuration."""
+        # Checked before building per-row debug messages
+        self._debug_enabled = False
+
         if not self.config['logging']['enabled']:
             return
 
@@ -72,8 +292,9 @@ class CSVSKUProcessor:
             ]
         )
         self.logger = logging.getLogger(__name__)
+        self._debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
 
-    def _create_backup(self, input_file: str) -> str:
+    def _create_backup(self, input_file: str) -> Optional[str]:
         """
         Create a backup of the input file.
 
@@ -81,7 +302,7 @@ class CSVSKUProcessor:
             input_file: Path to the input CSV file
 
         Returns:
-            Path to the backup file
+            Path to the backup file, or None if backups are disabled
         """
         if not self.config['general_settings']['create_backup']:
             return None
@@ -92,36 +313,15 @@ class CSVSKUProcessor:
         backup_file = input_path.parent / f"{input_path.stem}{backup_suffix}_{timestamp}{input_path.suffix}"
 
         try:
-            shutil.copy2(input_file, backup_file)
+            with open(input_file, 'rb') as src, open(backup_file, 'wb') as dst:
+                _copy_file_contents(src, dst)
+            shutil.copystat(input_file, backup_file)
             self.logger.info(f"Backup created: {backup_file}")
             return str(backup_file)
         except Exception as e:
             self.logger.error(f"Failed to create backup: {e}")
             raise
 
-    def _process_field_value(self, field_value: str) -> Tuple[str, bool]:
-        """
-        Process field value by replacing search_value with replace_value.
-
-        Args:
-            field_value: The field value to process
-
-        Returns:
-            Tuple of (processed_value, was_modified)
-        """
-        if not field_value or not isinstance(field_value, str):
-            return field_value, False
-
-        search_value = self.config['processing_rules']['search_value']
-        replace_value = self.config['processing_rules']['replace_value']
-
-        # Check if search value exists in the field value
-        if search_value and search_value in field_value:
-            new_value = field_value.replace(search_value, replace_value)
-            return new_value, True
-
-        return field_value, False
-
     def _process_json_data(self, json_str: str, row_num: int) -> Tuple[str, bool]:
         """
         Process JSON data to find and replace field values.
@@ -133,59 +333,50 @@ class CSVSKUProcessor:
         Returns:
             Tuple of (modified_json_string, was_modified)
         """
-        if not json_str or json_str.strip() == '':
-            self.stats['missing_hp_sku'].append({'row': row_num, 'reason': 'Empty column R'})
-            self.logger.debug(f"Row {row_num}: Column R is empty - no JSON data")
+        # isspace() avoids allocating a stripped copy of every cell
+        if not json_str or json_str.isspace():
+            self._record_detail('missing_hp_sku', row_num, 'Empty column R')
+            if self._debug_enabled:
+                self.logger.debug("Row %d: Column R is empty - no JSON data", row_num)
             return json_str, False
 
-        try:
-            # Parse JSON
-            data = json.loads(json_str)
-
-            # Handle both array and single object
-            if not isinstance(data, list):
-                data = [data]
-
-            modified = False
-            field_found = False
-
-            # Search for target field
-            target_field_name = self.config['processing_rules']['target_field_name']
-
-            for item in data:
-                if isinstance(item, dict) and item.get('name') == target_field_name:
-                    field_found = True
-                    original_value = item.get('value', '')
-                    new_value, was_modified = self._process_field_value(original_value)
-
-                    if was_modified:
-                        item['value'] = new_value
-                        modified = True
-                        self.stats['skus_modified'].append({
-                            'row': row_num,
-                            'original': original_value,
-                            'new': new_value
-                        })
-                        self.logger.debug(f"Row {row_num}: Modified field '{original_value}' -> '{new_value}'")
-                    else:
-                        self.stats['skus_unchanged'] += 1
-                    break
+        # Without escape sequences the target name can only appear as its
+        # quoted literal, so its absence means the field is missing
+        if self._name_needle not in json_str and '\\' not in json_str:
+            self._record_detail('missing_hp_sku', row_num, 'Target field not found in JSON')
+            if self._debug_enabled:
+                self.logger.debug("Row %d: Target field '%s' not found", row_num, self._target_field_name)
+            return json_str, False
 
-            if not field_found:
-                self.stats['missing_hp_sku'].append({'row': row_num, 'reason': 'Target field not found in JSON'})
-                self.logger.debug(f"Row {row_num}: Target field '{target_field_name}' not found")
+        try:
+            modified_json, modified, field_found, original_value, new_value = _process_json_cached(
+                json_str,
+                self._target_field_name,
+                self._search_value,
+                self._replace_value
+            )
+
+            if modified:
+                self._record_detail('skus_modified', row_num, original_value, new_value)
+                if self._debug_enabled:
+                    self.logger.debug("Row %d: Modified field '%s' -> '%s'", row_num, original_value, new_value)
+            elif field_found:
+                self.stats['skus_unchanged'] += 1
+            else:
+                self._record_detail('missing_hp_sku', row_num, 'Target field not found in JSON')
+                if self._debug_enabled:
+                    self.logger.debug("Row %d: Target field '%s' not found", row_num, self._target_field_name)
 
-            # Return modified JSON
-            return json.dumps(data, ensure_ascii=False), modified
+            return modified_json, modified
 
         except json.JSONDecodeError as e:
-            self.stats['malformed_json'].append({'row': row_num, 'error': str(e)})
+            self._record_detail('malformed_json', row_num, str(e))
             self.stats['errors'] += 1
-            self.logger.warning(f"Row {row_num}: Malformed JSON - {e}")
+            self.logger.warning("Row %d: Malformed JSON - %s", row_num, e)
             return json_str, False
         except Exception as e:
             self.stats['errors'] += 1
-            self.logger.error(f"Row {row_num}: Unexpected error processing JSON - {e}")
+            self.logger.error("Row %d: Unexpected error processing JSON - %s", row_num, e)
             return json_str, False
 
     def process_csv(self, input_file: str, output_file: str):
@@ -199,57 +390,65 @@ class CSVSKUProcessor:
         self.logger.info(f"Starting CSV processing: {input_file}")
         self.logger.info(f"Output will be saved to: {output_file}")
 
+        # Output is streamed while the input is still being read, so the two
+        # must not be the same file
+        if Path(output_file).resolve() == Path(input_file).resolve():
+            self.logger.error("Output file must be different from the input file")
+            raise ValueError(f"Output file is the same as the input file: {input_file}")
+
         # Create backup if configured
         if self.config['general_settings']['create_backup']:
             self._create_backup(input_file)
 
-        target_col_index = self.config['general_settings']['target_column_index']
         max_rows = self.config['general_settings']['max_rows_to_process']
+        # Large buffers cut the number of read/write syscalls on big files
+        io_buffer_bytes = self.config['general_settings'].get('io_buffer_bytes', 1 << 20)
+        # 1 processes rows in this process, 0 uses one worker per CPU
+        worker_processes = self.config['general_settings'].get('worker_processes', 1) or os.cpu_count() or 1
 
         try:
-            # Read and process CSV
-            with open(input_file, 'r', encoding='utf-8', newline='') as infile:
+            # Read, process and write CSV in a single streaming pass. The input
+            # is parsed by csv.reader rather than filtered line by line: quoted
+            # fields may span several lines, and every row has to be counted
+            # and column-checked for the summary. Rows that cannot match are
+            # dropped cheaply in _process_row instead.
+            with open(input_file, 'r', encoding='utf-8', newline='', buffering=io_buffer_bytes) as infile, \
+                    open(output_file, 'w', encoding='utf-8', newline='', buffering=io_buffer_bytes) as outfile:
                 reader = csv.reader(infile)
-                rows = []
-
-                for row_num, row in enumerate(reader, start=1):
-                    self.stats['total_rows'] += 1
-
-                    # Skip header row (row 1)
-                    if row_num == 1:
-                        rows.append(row)
-                        continue
-
-                    # Check max rows limit
-                    if row_num > max_rows:
-                        self.logger.warning(f"Reached maximum row limit ({max_rows}). Stopping processing.")
-                        break
-
-                    # Check if target column exists in this row
-                    if len(row) > target_col_index:
-                        json_data = row[target_col_index]
-                        modified_json, was_modified = self._process_json_data(json_data, row_num)
-
-                        # Update the row
-                        row[target_col_index] = modified_json
+                writer = csv.writer(outfile)
 
-                        if was_modified:
-                            self.stats['rows_modified'] += 1
-                            # Only add modified rows to output
-                            rows.append(row)
+                # Starting workers is wasted effort when no row can match
+                if worker_processes > 1 and not self._file_contains_search_value(infile):
+                    self.logger.info("Search value does not occur in the input file; processing in a single process")
+                    worker_processes = 1
 
-                        self.stats['rows_processed'] += 1
-                    else:
-                        self.logger.debug(f"Row {row_num}: Column {target_col_index} not found (row has {len(row)} columns)")
+                # Header row (row 1) is always written
+                header = next(reader, None)
+                if header is not None:
+                    self.stats['total_rows'] += 1
+                    writer.writerow(header)
+
+                if worker_processes > 1:
+                    self.logger.info(f"Processing rows with {worker_processes} worker processes")
+                    blocks = self._read_row_blocks(reader, max_rows, PARALLEL_BLOCK_SIZE)
+                    results = self._process_blocks_parallel(blocks, worker_processes)
+                else:
+                    blocks = self._read_row_blocks(reader, max_rows, WRITE_BATCH_SIZE)
+                    results = (
+                        (block[-1][0], self._process_row_block(block))
+                        for block in blocks
+                    )
+
+                progress_mark = 0
+                for last_row_num, out_rows in results:
+                    # Only modified rows are written to output
+                    if out_rows:
+                        writer.writerows(out_rows)
 
                     # Progress indicator for large files
-                    if row_num % 5000 == 0:
-                        self.logger.info(f"Processed {row_num} rows...")
-
-            # Write output CSV
-            with open(output_file, 'w', encoding='utf-8', newline='') as outfile:
-                writer = csv.writer(outfile)
-                writer.writerows(rows)
+                    if last_row_num // 5000 > progress_mark:
+                        progress_mark = last_row_num // 5000
+                        self.logger.info("Processed %d rows...", progress_mark * 5000)
 
             self.logger.info(f"Successfully wrote output to: {output_file}")
 
@@ -260,70 +459,217 @@ class CSVSKUProcessor:
             self.logger.error(f"Error processing CSV: {e}")
             raise
 
+    def _file_contains_search_value(self, infile) -> bool:
+        """
+        Scan the raw bytes of the input file for the search value.
+
+        The file is memory-mapped, so the scan does not move the read
+        position of infile. A value that CSV quoting alters (one containing
+        a double quote) may be missed, so a False result must only be used
+        as an optimisation hint.
+
+        Args:
+            infile: Open input file object
+
+        Returns:
+            True if the UTF-8 encoded search value occurs anywhere in the file
+        """
+        if os.fstat(infile.fileno()).st_size == 0:
+            return False
+
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm.find(self._search_value.encode('utf-8')) != -1
+
+    def _read_row_blocks(self, reader, max_rows: int, block_size: int) -> Iterator[List[Tuple[int, List[str]]]]:
+        """
+        Read data rows from the CSV reader in blocks.
+
+        Args:
+            reader: CSV reader positioned after the header row
+            max_rows: Maximum row number to process
+            block_size: Number of rows per block
+
+        Yields:
+            Lists of (row_num, row) pairs
+        """
+        block = []
+        for row_num, row in enumerate(reader, start=2):
+            self.stats['total_rows'] += 1
+
+            # Check max rows limit
+            if row_num > max_rows:
+                self.logger.warning(f"Reached maximum row limit ({max_rows}). Stopping processing.")
+                break
+
+            block.append((row_num, row))
+            if len(block) >= block_size:
+                yield block
+                block = []
+
+        if block:
+            yield block
+
+    def _process_blocks_parallel(self, blocks: Iterator[List[Tuple[int, List[str]]]],
+                                 worker_processes: int) -> Iterator[Tuple[int, List[List[str]]]]:
+        """
+        Process row blocks in a pool of worker processes.
+
+        Only a bounded number of blocks is in flight at once so memory use
+        stays independent of the file size. Results are yielded in input
+        order and each block's statistics are merged into self.stats.
+
+        Args:
+            blocks: Iterator of row blocks from _read_row_blocks
+            worker_processes: Number of worker processes
+
+        Yields:
+            Tuple of (last_row_num, modified_rows) per block
+        """
+        with ProcessPoolExecutor(max_workers=worker_processes,
+                                 initializer=_init_worker, initargs=(self,)) as executor:
+            pending = deque()
+            for block in blocks:
+                future = executor.submit(_process_block_in_worker, block)
+                pending.append((block[-1][0], future))
+
+                if len(pending) >= worker_processes * 2:
+                    last_row_num, future = pending.popleft()
+                    out_rows, partial_stats = future.result()
+                    self._merge_stats(partial_stats)
+                    yield last_row_num, out_rows
+
+            while pending:
+                last_row_num, future = pending.popleft()
+                out_rows, partial_stats = future.result()
+                self._merge_stats(partial_stats)
+                yield last_row_num, out_rows
+
+    def _process_row_block(self, block: List[Tuple[int, List[str]]]) -> List[List[str]]:
+        """
+        Process a block of data rows.
+
+        Args:
+            block: List of (row_num, row) pairs
+
+        Returns:
+            List of modified rows, in input order
+        """
+        return [row for row_num, row in block if self._process_row(row, row_num)]
+
+    def _process_row(self, row: List[str], row_num: int) -> bool:
+        """
+        Process a single data row, updating the target column in place.
+
+        Args:
+            row: Parsed CSV row
+            row_num: Row number for error reporting
+
+        Returns:
+            True if the row was modified
+        """
+        target_col_index = self._target_col_index
+
+        # Check if target column exists in this row
+        if len(row) <= target_col_index:
+            if self._debug_enabled:
+                self.logger.debug("Row %d: Column %d not found (row has %d columns)",
+                                  row_num, target_col_index, len(row))
+            return False
+
+        self.stats['rows_processed'] += 1
+        json_data = row[target_col_index]
+
+        # Skip the JSON roundtrip when the search value cannot match. Cells
+        # with escape sequences may encode it differently, so they are parsed,
+        # and blank cells are left for _process_json_data to report
+        if (json_data and self._search_value not in json_data and '\\' not in json_data
+                and not json_data.isspace()):
+            self.stats['rows_skipped'] += 1
+            return False
+
+        modified_json, was_modified = self._process_json_data(json_data, row_num)
+
+        # Update the row
+        row[target_col_index] = modified_json
+
+        if was_modified:
+            self.stats['rows_modified'] += 1
+
+        return was_modified
+
     def write_detailed_logs(self):
         """Write detailed logs to separate files for successful changes, errors, and missing fields."""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
         # Log 1: Successful Changes
-        if self.stats['skus_modified']:
+        if self.stats['skus_modified_count']:
             success_log = f"successful_changes_{timestamp}.log"
             with open(success_log, 'w', encoding='utf-8') as f:
                 f.write("="*60 + "\n")
                 f.write("SUCCESSFUL FIELD MODIFICATIONS\n")
                 f.write("="*60 + "\n")
                 f.write(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Total modifications: {len(self.stats['skus_modified'])}\n")
+                f.write(f"Total modifications: {self.stats['skus_modified_count']}\n")
                 f.write("="*60 + "\n\n")
 
-                for mod in self.stats['skus_modified']:
-                    f.write(f"Row {mod['row']}: '{mod['original']}' -> '{mod['new']}'\n")
+                for row, original, new in self._detail_entries('skus_modified'):
+                    f.write(f"Row {row}: '{original}' -> '{new}'\n")
 
                 f.write("\n" + "="*60 + "\n")
-                f.write(f"End of log - Total entries: {len(self.stats['skus_modified'])}\n")
+                self._write_truncation_note(f, 'skus_modified')
+                f.write(f"End of log - Total entries: {len(self.stats['skus_modified'][0])}\n")
                 f.write("="*60 + "\n")
 
             self.logger.info(f"Successful changes log written to: {success_log}")
 
         # Log 2: Errors/Malformed JSON
-        if self.stats['malformed_json']:
+        if self.stats['malformed_json_count']:
             error_log = f"errors_malformed_json_{timestamp}.log"
             with open(error_log, 'w', encoding='utf-8') as f:
                 f.write("="*60 + "\n")
                 f.write("ERRORS AND MALFORMED JSON\n")
                 f.write("="*60 + "\n")
                 f.write(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Total errors: {len(self.stats['malformed_json'])}\n")
+                f.write(f"Total errors: {self.stats['malformed_json_count']}\n")
                 f.write("="*60 + "\n\n")
 
-                for error in self.stats['malformed_json']:
-                    f.write(f"Row {error['row']}: {error['error']}\n")
+                for row, error in self._detail_entries('malformed_json'):
+                    f.write(f"Row {row}: {error}\n")
 
                 f.write("\n" + "="*60 + "\n")
-                f.write(f"End of log - Total entries: {len(self.stats['malformed_json'])}\n")
+                self._write_truncation_note(f, 'malformed_json')
+                f.write(f"End of log - Total entries: {len(self.stats['malformed_json'][0])}\n")
                 f.write("="*60 + "\n")
 
             self.logger.info(f"Errors/malformed JSON log written to: {error_log}")
 
         # Log 3: Missing Target Field
-        if self.stats['missing_hp_sku']:
+        if self.stats['missing_hp_sku_count']:
             missing_log = f"missing_target_field_{timestamp}.log"
             with open(missing_log, 'w', encoding='utf-8') as f:
                 f.write("="*60 + "\n")
                 f.write("ROWS MISSING TARGET FIELD\n")
                 f.write("="*60 + "\n")
                 f.write(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Total rows missing target field: {len(self.stats['missing_hp_sku'])}\n")
+                f.write(f"Total rows missing target field: {self.stats['missing_hp_sku_count']}\n")
                 f.write("="*60 + "\n\n")
 
-                for entry in self.stats['missing_hp_sku']:
-                    f.write(f"Row {entry['row']}: {entry['reason']}\n")
+                for row, reason in self._detail_entries('missing_hp_sku'):
+                    f.write(f"Row {row}: {reason}\n")
 
                 f.write("\n" + "="*60 + "\n")
-                f.write(f"End of log - Total entries: {len(self.stats['missing_hp_sku'])}\n")
+                self._write_truncation_note(f, 'missing_hp_sku')
+                f.write(f"End of log - Total entries: {len(self.stats['missing_hp_sku'][0])}\n")
                 f.write("="*60 + "\n")
 
             self.logger.info(f"Missing target field log written to: {missing_log}")
 
+    def _write_truncation_note(self, f, key: str):
+        """Note in a detailed log when entries beyond max_detail_entries were dropped."""
+        omitted = self.stats[key + '_count'] - len(self.stats[key][0])
+        if omitted > 0:
+            f.write(f"... {omitted} more entries not listed (max_detail_entries = {self._max_detail})\n")
+
     def print_summary(self):
         """Print a summary of the processing results."""
         print("\n" + "="*60)
@@ -334,37 +680,62 @@ class CSVSKUProcessor:
         print(f"Rows modified:             {self.stats['rows_modified']}")
         print(f"Rows in output file:       {self.stats['rows_modified'] + 1}")  # +1 for header
         print(f"Rows excluded:             {self.stats['total_rows'] - self.stats['rows_modified'] - 1}")  # -1 for header
+        print(f"Rows without search value: {self.stats['rows_skipped']}")
         print(f"Fields unchanged:          {self.stats['skus_unchanged']}")
         print(f"Errors encountered:        {self.stats['errors']}")
-        print(f"Malformed JSON rows:       {len(self.stats['malformed_json'])}")
-        print(f"Rows missing target field: {len(self.stats['missing_hp_sku'])}")
+        print(f"Malformed JSON rows:       {self.stats['malformed_json_count']}")
+        print(f"Rows missing target field: {self.stats['missing_hp_sku_count']}")
         print("="*60)
 
-        if self.stats['malformed_json']:
+        if self.stats['malformed_json_count']:
             print("\nRows with malformed JSON:")
-            for error in self.stats['malformed_json'][:10]:  # Show first 10
-                print(f"  Row {error['row']}: {error['error']}")
-            if len(self.stats['malformed_json']) > 10:
-                print(f"  ... and {len(self.stats['malformed_json']) - 10} more")
-
-        if self.stats['missing_hp_sku']:
-            print(f"\nRows missing target field: {len(self.stats['missing_hp_sku'])}")
-            if len(self.stats['missing_hp_sku']) <= 20:
-                for entry in self.stats['missing_hp_sku']:
-                    print(f"  Row {entry['row']}: {entry['reason']}")
+            for row, error in self._detail_entries('malformed_json', 10):  # Show first 10
+                print(f"  Row {row}: {error}")
+            if self.stats['malformed_json_count'] > 10:
+                print(f"  ... and {self.stats['malformed_json_count'] - 10} more")
+
+        if self.stats['missing_hp_sku_count']:
+            print(f"\nRows missing target field: {self.stats['missing_hp_sku_count']}")
+            if self.stats['missing_hp_sku_count'] <= 20:
+                for row, reason in self._detail_entries('missing_hp_sku'):
+                    print(f"  Row {row}: {reason}")
             else:
                 print("  First 20 rows:")
-                for entry in self.stats['missing_hp_sku'][:20]:
-                    print(f"  Row {entry['row']}: {entry['reason']}")
+                for row, reason in self._detail_entries('missing_hp_sku', 20):
+                    print(f"  Row {row}: {reason}")
 
-        if self.stats['skus_modified']:
+        if self.stats['skus_modified_count']:
             print(f"\nSample of modified fields (first 10):")
-            for mod in self.stats['skus_modified'][:10]:
-                print(f"  Row {mod['row']}: '{mod['original']}' -> '{mod['new']}'")
+            for row, original, new in self._detail_entries('skus_modified', 10):
+                print(f"  Row {row}: '{original}' -> '{new}'")
 
         print("\n" + "="*60)
 
 
+# Processor instance owned by each worker process in parallel mode
+_worker_processor = None
+
+
+def _init_worker(processor: CSVSKUProcessor):
+    """Initialise a worker process with a copy of the parent's processor."""
+    global _worker_processor
+    processor._setup_logging()
+    _worker_processor = processor
+
+
+def _process_block_in_worker(block: List[Tuple[int, List[str]]]) -> Tuple[List[List[str]], Dict]:
+    """
+    Process a block of rows in a worker process.
+
+    Returns:
+        Tuple of (modified_rows, stats) where stats only covers this block
+    """
+    processor = _worker_processor
+    processor.stats = processor._new_stats()
+    out_rows = processor._process_row_block(block)
+    return out_rows, processor.stats
+
+
 def get_file_paths(config: Dict) -> Tuple[str, str]:
     """
     Get input and output file paths from config or user input.